@@ -0,0 +1,147 @@
+# app/__init__.py
+import os
+import atexit
+import logging
+import logging.handlers
+import queue
+import sqlite3
+import orjson
+import redis
+from dotenv import load_dotenv
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from celery import Celery
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+
+# Load local .env only if present (safe for dev)
+load_dotenv()
+
+# Twilio credentials (from Render ENV or .env locally)
+ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_NUMBER = os.getenv("TWILIO_NUMBER")
+
+# Logging: records go through a queue, a listener thread writes them to stderr
+log_queue = queue.SimpleQueue()
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s"
+log_listener = None
+
+def start_log_listener():
+    # Threads don't survive fork, so gunicorn calls this again in each worker
+    global log_listener
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_listener = logging.handlers.QueueListener(log_queue, handler)
+    log_listener.start()
+
+def stop_log_listener():
+    # Writes out everything still queued before returning
+    global log_listener
+    if log_listener is not None:
+        log_listener.stop()
+        log_listener = None
+
+start_log_listener()
+atexit.register(stop_log_listener)
+logger = logging.getLogger("sms")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+# Our queue handler is the only output; root handlers (e.g. Celery's) would print it twice
+logger.propagate = False
+
+logger.info("ACCOUNT_SID %s, TWILIO_NUMBER %s, AUTH_TOKEN set: %s", ACCOUNT_SID, TWILIO_NUMBER, bool(AUTH_TOKEN))
+if not (ACCOUNT_SID and AUTH_TOKEN and TWILIO_NUMBER):
+    raise RuntimeError(
+        "Missing Twilio credentials: set TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN and TWILIO_NUMBER "
+        "either in a .env (local) or Render Environment Variables (production)"
+    )
+
+
+# Persistent HTTPS session so TCP+TLS connections to Twilio are reused across sends
+TWILIO_POOL_SIZE = 20
+twilio_session = requests.Session()
+twilio_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=TWILIO_POOL_SIZE,
+        pool_maxsize=TWILIO_POOL_SIZE,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ),
+)
+twilio_http = TwilioHttpClient()
+twilio_http.session = twilio_session
+
+client = Client(ACCOUNT_SID, AUTH_TOKEN, http_client=twilio_http)
+
+# orjson (C extension) instead of stdlib json for jsonify / request.get_json
+# Naive DB datetimes are UTC and serialize natively as ISO 8601 with a "Z" suffix
+ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+class ORJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# SQLite: WAL lets readers and the writer run concurrently instead of
+# serializing on the database lock (production should set DATABASE_URL to
+# Postgres, e.g. postgresql+psycopg://...)
+@event.listens_for(Engine, "connect")
+def _sqlite_wal(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# Flask app and DB
+app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Delivery-status callback URL; if unset it's built from SERVER_NAME at startup
+app.config["STATUS_CB_URL"] = os.getenv("STATUS_CALLBACK_URL")
+app.config["SERVER_NAME"] = os.getenv("SERVER_NAME")
+app.config["PREFERRED_URL_SCHEME"] = os.getenv("PREFERRED_URL_SCHEME", "https")
+app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///sms.db")
+app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Reuse pooled connections across requests; under gunicorn+gevent size the pool
+# to roughly worker_connections / workers
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 20)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,  # recycle before Postgres drops idle connections
+}
+db = SQLAlchemy(app)
+
+# Redis (Celery broker and /messages response cache)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+cache = redis.Redis.from_url(REDIS_URL)
+MESSAGES_CACHE_TTL = 60
+
+def bump_messages_version():
+    # Invalidates cached /messages pages and their ETags
+    cache.incr("messages:version")
+
+# Celery (Twilio API calls run in the worker, not in the request)
+# Run workers with: celery -A app.celery worker -P gevent
+# (-P must be on the command line: Celery only monkey-patches for gevent when
+# the pool is given there, otherwise blocking Twilio calls stall the worker)
+celery = Celery("sms", broker=REDIS_URL)
+# One green thread per pooled Twilio connection; stays within the DB pool too
+celery.conf.worker_concurrency = int(os.getenv("CELERY_CONCURRENCY", TWILIO_POOL_SIZE))
+
+# Models, Celery tasks and routes register themselves on the objects above
+from app import models, tasks, routes  # noqa: E402,F401
+from app.models import Message  # noqa: E402,F401
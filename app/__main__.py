@@ -0,0 +1,9 @@
+# app/__main__.py
+# Local dev server: python -m app (production: gunicorn -c gunicorn.conf.py app:app)
+from app import app
+from app.models import init_db
+
+if __name__ == "__main__":
+    with app.app_context():
+        init_db()
+    app.run(host="0.0.0.0", port=5000)
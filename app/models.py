@@ -0,0 +1,41 @@
+# app/models.py
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from app import app, db
+
+
+# DB model
+class Message(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    sid = db.Column(db.String(64), unique=True, index=True, nullable=True)  # Twilio SIDs are unique
+    from_number = db.Column(db.String(32))
+    to_number = db.Column(db.String(32))
+    body = db.Column(db.Text)
+    direction = db.Column(db.String(10))  # 'inbound' or 'outbound'
+    status = db.Column(db.String(32), default="received")
+    error_code = db.Column(db.String(32), nullable=True)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Composite index for keyset pagination on /messages
+    __table_args__ = (db.Index("ix_msg_ts_id", timestamp.desc(), id.desc()),)
+
+
+def init_db():
+    # create_all() only builds indexes along with a new table, so bring the
+    # indexes of an existing "message" table in line with the model as well
+    db.create_all()
+    existing = {ix["name"]: ix for ix in inspect(db.engine).get_indexes(Message.__tablename__)}
+    for index in Message.__table__.indexes:
+        current = existing.get(index.name)
+        if current is not None and bool(current["unique"]) != bool(index.unique):
+            index.drop(db.engine)
+            current = None
+        if current is None:
+            index.create(db.engine)
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create the tables and indexes: flask --app app init-db"""
+    init_db()
@@ -0,0 +1,274 @@
+# app/routes.py
+import re
+from datetime import datetime, timezone
+
+import fastjsonschema
+import orjson
+from flask import Response, request, jsonify, url_for, stream_with_context
+from sqlalchemy import and_, insert, or_, update
+from twilio.twiml.messaging_response import MessagingResponse
+
+from app import (
+    MESSAGES_CACHE_TTL,
+    ORJSON_OPTS,
+    TWILIO_NUMBER,
+    app,
+    bump_messages_version,
+    cache,
+    db,
+    logger,
+)
+from app.models import Message
+from app.tasks import queue_inbound, send_sms_task
+
+
+# E.164 phone numbers, e.g. +14155552671
+PHONE_RE = re.compile(r"\+[1-9]\d{1,14}")
+
+# Send SMS endpoint
+@app.route("/send-sms", methods=["POST"])
+def send_sms():
+    # Decode the raw body once with orjson, whatever the Content-Type
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        return jsonify({"error": "invalid JSON body"}), 400
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON body must be an object"}), 400
+
+    to = data.get("to")
+    body = data.get("message")
+    if not to or not body:
+        return jsonify({"error": "missing 'to' or 'message'"}), 400
+    if not isinstance(to, str) or not PHONE_RE.fullmatch(to):
+        return jsonify({"error": "'to' must be an E.164 phone number"}), 400
+    if not isinstance(body, str):
+        return jsonify({"error": "'message' must be a string"}), 400
+
+    # Status callback URL for delivery updates (fixed at startup)
+    status_cb = app.config["STATUS_CB_URL"]
+
+    # Save outbound message, the Twilio call happens in the Celery worker
+    # (Core insert, skips ORM unit-of-work for a single row)
+    result = db.session.execute(
+        insert(Message.__table__).values(
+            sid=None,
+            from_number=TWILIO_NUMBER,
+            to_number=to,
+            body=body,
+            direction="outbound",
+            status="queued_local",
+        )
+    )
+    db.session.commit()
+    bump_messages_version()
+    msg_id = result.inserted_primary_key[0]
+
+    send_sms_task.delay(to, body, status_cb, msg_id)
+
+    return jsonify({"status": "queued", "id": msg_id}), 202
+
+# Schema for the JSON "Payload" form field of inbound webhooks, compiled once at
+# import; missing fields are filled with None so the handler can index directly.
+# Numbers are accepted too (e.g. an unquoted From) and turned into strings.
+_sms_field = {"type": ["string", "number", "null"], "default": None}
+validate_webhook_payload = fastjsonschema.compile({
+    "type": "object",
+    "properties": {
+        "webhook": {
+            "type": "object",
+            "properties": {
+                "request": {
+                    "type": "object",
+                    "properties": {
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "From": _sms_field,
+                                "To": _sms_field,
+                                "Body": _sms_field,
+                                "SmsBody": _sms_field,
+                            },
+                        },
+                    },
+                    "required": ["parameters"],
+                },
+            },
+            "required": ["request"],
+        },
+    },
+    "required": ["webhook"],
+})
+
+# Static auto-reply TwiML, rendered once at import
+_autoreply = MessagingResponse()
+_autoreply.message("✅ Thanks — we received your message.")
+AUTOREPLY_TWIML = str(_autoreply).encode()
+
+def _as_str(value):
+    return None if value is None else str(value)
+
+def _extract_sms_fields(req):
+    # Fields come from the JSON "Payload" form field when present,
+    # falling back to regular form fields
+    payload = req.form.get("Payload")
+    from_number = None
+    to_number = None
+    body = None
+
+    if payload:
+        try:
+            payload_data = validate_webhook_payload(orjson.loads(payload))
+            msg_data = payload_data["webhook"]["request"]["parameters"]
+            from_number = _as_str(msg_data["From"])
+            to_number = _as_str(msg_data["To"])
+            body = _as_str(msg_data["Body"]) or _as_str(msg_data["SmsBody"])
+        except orjson.JSONDecodeError as e:
+            logger.warning("❌ Error parsing payload: %s", e)
+        except fastjsonschema.JsonSchemaException:
+            # Not a webhook-shaped payload: use the form fields below
+            pass
+
+    if not from_number:
+        from_number = req.form.get("From")
+    if not to_number:
+        to_number = req.form.get("To")
+    if not body:
+        body = req.form.get("Body")
+
+    return from_number, to_number, body
+
+# Receive SMS endpoint
+@app.route("/receive-sms", methods=["GET", "POST"])
+def receive_sms():
+    from_number, to_number, body = _extract_sms_fields(request)
+    logger.info("📩 Incoming SMS from %s: %s", from_number, body)
+
+    # Buffered and bulk-saved by the Celery worker, the request doesn't wait on the commit
+    queue_inbound(from_number, to_number, body, datetime.utcnow())
+
+    # Return TwiML response
+    return Response(AUTOREPLY_TWIML, status=200, mimetype="application/xml")
+
+
+# Status callback endpoint
+@app.route("/sms/status", methods=["POST"])
+def status_callback():
+    sid = request.form.get("MessageSid")
+    status = request.form.get("MessageStatus")
+    error_code = request.form.get("ErrorCode")
+    # Without a sid the WHERE below would become "sid IS NULL" and hit every unsent row
+    if not sid:
+        return jsonify({"error": "missing 'MessageSid'"}), 400
+
+    # Single UPDATE by sid, no SELECT round trip
+    result = db.session.execute(
+        update(Message)
+        .where(Message.sid == sid)
+        .values(status=status, error_code=error_code)
+    )
+    # The callback can arrive before send_sms_task has stored the sid; match the
+    # local id from the callback URL instead
+    msg_id = request.args.get("id", type=int)
+    if not result.rowcount and msg_id:
+        result = db.session.execute(
+            update(Message)
+            .where(
+                Message.id == msg_id,
+                Message.direction == "outbound",
+                Message.status.in_(("queued_local", "unknown")),
+                Message.sid.is_(None),
+            )
+            .values(sid=sid, status=status, error_code=error_code)
+        )
+    db.session.commit()
+    if result.rowcount:
+        bump_messages_version()
+        logger.info("📤 Updated message %s status: %s", sid, status)
+    else:
+        logger.warning("⚠️ No message found for status update %s", sid)
+
+    return ("", 204)
+
+# View all messages
+@app.route("/messages", methods=["GET"])
+def get_all_messages():
+    # Keyset pagination on (timestamp, id): ?before=<iso timestamp>&before_id=<id>&limit=100
+    # (pass the last row's timestamp and id to get the next page)
+    before = request.args.get("before")
+    before_id = request.args.get("before_id", type=int)
+    limit = min(request.args.get("limit", 100, type=int), 1000)
+    if limit < 1:
+        return jsonify({"error": "'limit' must be positive"}), 400
+    if before:
+        try:
+            before = datetime.fromisoformat(before)
+        except ValueError:
+            return jsonify({"error": "'before' must be an ISO timestamp"}), 400
+        # Timestamps are stored as naive UTC
+        if before.tzinfo:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+
+    # Version is bumped on every write, so it doubles as ETag and cache key
+    version = int(cache.get("messages:version") or 0)
+    cache_key = f"messages:{version}:{limit}:{before.isoformat() if before else ''}:{before_id or ''}"
+    if request.if_none_match.contains(cache_key):
+        return Response(status=304)
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        resp = Response(cached, status=200, mimetype="application/json")
+        resp.set_etag(cache_key)
+        resp.headers["Cache-Control"] = "no-cache"
+        return resp
+
+    # Only pull the serialized columns as tuples, no ORM objects
+    q = (
+        db.session.query(
+            Message.id,
+            Message.sid,
+            Message.from_number,
+            Message.to_number,
+            Message.body,
+            Message.direction,
+            Message.status,
+            Message.error_code,
+            Message.timestamp,
+        )
+        .order_by(Message.timestamp.desc(), Message.id.desc())
+    )
+    if before and before_id:
+        q = q.filter(or_(
+            Message.timestamp < before,
+            and_(Message.timestamp == before, Message.id < before_id),
+        ))
+    elif before:
+        q = q.filter(Message.timestamp < before)
+    rows = q.limit(limit).yield_per(1000)
+
+    def generate():
+        chunks = [b"["]
+        yield chunks[0]
+        for i, row in enumerate(rows):
+            chunk = (b"," if i else b"") + orjson.dumps(row._asdict(), option=ORJSON_OPTS)
+            chunks.append(chunk)
+            yield chunk
+        chunks.append(b"]")
+        yield chunks[-1]
+        cache.set(cache_key, b"".join(chunks), ex=MESSAGES_CACHE_TTL)
+
+    resp = Response(stream_with_context(generate()), status=200, mimetype="application/json")
+    resp.set_etag(cache_key)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+# Build the status callback URL once at startup from config, never from a
+# request's Host header (which any client could set)
+if not app.config["STATUS_CB_URL"]:
+    if not app.config["SERVER_NAME"]:
+        raise RuntimeError(
+            "Missing status callback URL: set STATUS_CALLBACK_URL, or SERVER_NAME "
+            "(and PREFERRED_URL_SCHEME) so it can be built from the route"
+        )
+    with app.app_context():
+        app.config["STATUS_CB_URL"] = url_for("status_callback", _external=True)
@@ -0,0 +1,147 @@
+# app/tasks.py
+from datetime import datetime
+
+import orjson
+import requests
+from sqlalchemy import case, insert, update
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from twilio.base.exceptions import TwilioRestException
+from urllib3.exceptions import ConnectTimeoutError
+
+from app import TWILIO_NUMBER, app, bump_messages_version, cache, celery, client, db, logger
+from app.models import Message
+
+
+@celery.task(bind=True, max_retries=3)
+def send_sms_task(self, to, body, status_cb, msg_id):
+    # The local id lets /sms/status match a callback that beats the sid commit below
+    status_cb = f"{status_cb}{'&' if '?' in status_cb else '?'}id={msg_id}"
+    try:
+        message = client.messages.create(
+            body=body, from_=TWILIO_NUMBER, to=to, status_callback=status_cb
+        )
+    except TwilioRestException as e:
+        # messages.create isn't idempotent: only retry when Twilio certainly
+        # didn't accept the message (429). A 5xx may still have been sent, so
+        # it's marked "unknown" and a later status callback can fill it in.
+        if e.status == 429 and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries)
+        logger.error("❌ Twilio send failed for message %s: %s", msg_id, e)
+        _mark_send_result(msg_id, "unknown" if e.status >= 500 else "failed", str(e.code or e.status))
+        return
+    except requests.exceptions.ConnectionError as e:
+        # Safe to resend only if the connection was never established
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        if isinstance(reason, ConnectTimeoutError) and self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=2 ** self.request.retries)
+        logger.error("❌ Twilio send failed for message %s: %s", msg_id, e)
+        _mark_send_result(msg_id, "failed" if isinstance(reason, ConnectTimeoutError) else "unknown", None)
+        return
+
+    # Store Twilio's sid; keep the status if a callback already updated it
+    with app.app_context():
+        db.session.execute(
+            update(Message)
+            .where(Message.id == msg_id)
+            .values(
+                sid=message.sid,
+                status=case(
+                    (Message.status == "queued_local", message.status),
+                    else_=Message.status,
+                ),
+            )
+        )
+        db.session.commit()
+        bump_messages_version()
+
+def _mark_send_result(msg_id, status, error_code):
+    with app.app_context():
+        db.session.execute(
+            update(Message)
+            .where(Message.id == msg_id)
+            .values(status=status, error_code=error_code)
+        )
+        db.session.commit()
+        bump_messages_version()
+
+# Inbound SMS are buffered in a Redis list and bulk-inserted by the worker:
+# the first message in a window schedules one flush, which drains the list in
+# executemany batches (one commit per batch instead of one per SMS)
+INBOUND_KEY = "inbound:pending"
+INBOUND_FLUSH_KEY = "inbound:flush_scheduled"
+INBOUND_DEAD_KEY = "inbound:dead"
+INBOUND_FLUSH_DELAY = 0.1
+INBOUND_FLUSH_SIZE = 200
+
+def queue_inbound(from_number, to_number, body, received_at):
+    cache.rpush(INBOUND_KEY, orjson.dumps({
+        "from_number": from_number,
+        "to_number": to_number,
+        "body": body,
+        "received_at": received_at.isoformat(),
+    }))
+    # The flag expires so a flush that never ran doesn't block later ones
+    if cache.set(INBOUND_FLUSH_KEY, 1, nx=True, ex=60):
+        flush_inbound.apply_async(countdown=INBOUND_FLUSH_DELAY)
+
+def _inbound_row(item):
+    data = orjson.loads(item)
+    return {
+        "sid": None,
+        "from_number": data["from_number"],
+        "to_number": data["to_number"],
+        "body": data["body"],
+        "direction": "inbound",
+        "status": "received",
+        "timestamp": datetime.fromisoformat(data["received_at"]),
+    }
+
+@celery.task(bind=True, max_retries=None)
+def flush_inbound(self):
+    # Clear the flag first so anything pushed after this point schedules a new flush
+    cache.delete(INBOUND_FLUSH_KEY)
+    with app.app_context():
+        while True:
+            items = cache.lpop(INBOUND_KEY, INBOUND_FLUSH_SIZE)
+            if not items:
+                break
+            try:
+                saved = _save_inbound_batch(items)
+            except OperationalError as e:
+                # DB unreachable: put the unsaved rows back and retry with backoff
+                db.session.rollback()
+                cache.lpush(INBOUND_KEY, *reversed(e.unsaved_items))
+                logger.warning("⚠️ Inbound flush failed, retrying: %s", e)
+                raise self.retry(exc=e, countdown=min(2 ** self.request.retries, 60))
+            if saved:
+                bump_messages_version()
+                logger.info("✅ Saved %d inbound SMS to DB.", saved)
+
+def _save_inbound_batch(items):
+    # One executemany for the batch; if a row is rejected, fall back to row by
+    # row and move the bad ones to a dead-letter list so they can't block the queue.
+    # OperationalError is re-raised with .unsaved_items for the caller to requeue.
+    try:
+        db.session.execute(insert(Message.__table__), [_inbound_row(item) for item in items])
+        db.session.commit()
+        return len(items)
+    except OperationalError as e:
+        e.unsaved_items = items
+        raise
+    except SQLAlchemyError:
+        db.session.rollback()
+
+    saved = 0
+    for i, item in enumerate(items):
+        try:
+            db.session.execute(insert(Message.__table__), [_inbound_row(item)])
+            db.session.commit()
+            saved += 1
+        except OperationalError as e:
+            e.unsaved_items = items[i:]
+            raise
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            cache.rpush(INBOUND_DEAD_KEY, item)
+            logger.error("❌ Inbound SMS moved to %s: %s", INBOUND_DEAD_KEY, e)
+    return saved
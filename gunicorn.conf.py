@@ -0,0 +1,51 @@
+# gunicorn.conf.py
+# Run with: gunicorn -c gunicorn.conf.py app:app (behind Nginx as reverse proxy)
+# The master creates the DB schema on startup (or run: flask --app app init-db)
+from gevent import monkey
+
+monkey.patch_all()
+
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# gevent workers multiplex the I/O-bound endpoints (Twilio HTTP, DB commits)
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_connections = 1000
+keepalive = 5
+
+# Access and error logs to stdout/stderr
+accesslog = "-"
+errorlog = "-"
+
+# Import the app once in the master and fork workers with warm imports
+preload_app = True
+
+
+def when_ready(server):
+    # Create the schema once in the preloaded master, before any worker starts
+    from app import app, db
+    from app.models import init_db
+
+    with app.app_context():
+        init_db()
+        db.engine.dispose()
+
+
+def pre_fork(server, worker):
+    # Drain import-time log records in the master so forked workers don't
+    # inherit (and emit again) a copy of the queue
+    from app import stop_log_listener
+
+    stop_log_listener()
+
+
+def post_fork(server, worker):
+    # Threads and pooled DB connections don't survive fork; rebuild them per worker
+    from app import app, db, start_log_listener
+
+    start_log_listener()
+    with app.app_context():
+        db.engine.dispose(close=False)